@@ -3,25 +3,170 @@ Script para generar sentencias SQL INSERT desde el Excel procesado.
 Genera SQL compatible con PostgreSQL y el schema de Prisma.
 """
 
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
 
 
-def escape_sql_string(value):
-    """Escapa comillas simples para SQL."""
-    if pd.isna(value) or value == "" or value is None:
-        return "NULL"
+# Esquema de columnas por tabla: (columna, tipo, valor por defecto).
+# Solo estas columnas se leen del Excel, con el dtype que indica su tipo.
+PRODUCTS_SCHEMA = [
+    ("codigo", "text", None),
+    ("nombre", "text", None),
+    ("costoUnitario", "float", 0),
+    ("ubicacion", "text", "ALMACEN PRINCIPAL"),
+    ("salidas", "int", 0),
+    ("stockActual", "int", 0),
+    ("stockMinimo", "int", 0),
+    ("unidadMedida", "text", "UND"),
+    ("providerId", "int", 1),
+    ("costoTotal", "float", 0),
+]
+
+MOVEMENT_ENTRIES_SCHEMA = [
+    ("fecha", "text", None),
+    ("codigoProducto", "text", None),
+    ("descripcion", "text", None),
+    ("precioUnitario", "float", 0),
+    ("cantidad", "int", 0),
+]
+
+MOVEMENT_EXITS_SCHEMA = [
+    ("fecha", "text", None),
+    ("codigoProducto", "text", None),
+    ("descripcion", "text", None),
+    ("precioUnitario", "float", 0),
+    ("cantidad", "int", 0),
+    ("responsable", "text", None),
+    ("area", "text", None),
+    ("proyecto", "text", None),
+]
+
+# Las columnas numéricas se leen como object y se convierten después, porque
+# ScriptETL deja textos como "-" o "3 und" en stockActual, salidas, etc.
+COLUMN_DTYPES = {
+    "text": str,
+    "int": object,
+    "float": object,
+}
+
+# Patrón para extraer el número de celdas con texto (ej: "3 und" → 3)
+NUMERIC_PATTERNS = {
+    "int": r"(\d+)",
+    "float": r"(\d+(?:\.\d+)?)",
+}
+
+
+def read_sheet(excel_file, sheet_name, schema):
+    """Lee solo las columnas del esquema con dtypes explícitos."""
+    
+    columns = [column for column, _, _ in schema]
+    dtypes = {column: COLUMN_DTYPES[kind] for column, kind, _ in schema}
+    
+    df = pd.read_excel(
+        excel_file,
+        sheet_name=sheet_name,
+        usecols=lambda column: column in columns,
+        dtype=dtypes,
+    )
+    
+    # Columnas ausentes (p. ej. eliminadas por estar vacías) y nulos toman el valor por defecto
+    for column, kind, default in schema:
+        if column not in df.columns:
+            df[column] = default
+            continue
+        if kind != "text":
+            df[column] = parse_numeric_column(df[column], kind, sheet_name)
+        if default is not None:
+            df[column] = df[column].fillna(default)
+    
+    return df[columns]
+
+
+def parse_numeric_column(series, kind, sheet_name):
+    """Convierte una columna a número, extrayendo el valor de celdas con texto."""
+    
+    numbers = pd.to_numeric(series, errors="coerce").astype("float64")
+    has_text = numbers.isna() & series.notna()
+    
+    if not has_text.any():
+        return numbers
+    
+    # Como extract_numeric_value en ScriptETL: "3 und" → 3; sin dígitos ("-") queda vacío
+    extracted = series[has_text].astype(str).str.extract(NUMERIC_PATTERNS[kind], expand=False)
+    numbers.loc[has_text] = pd.to_numeric(extracted, errors="coerce")
+    
+    converted = extracted.notna().sum()
+    blank = has_text.sum() - converted
+    print(
+        f"  → {sheet_name}.{series.name}: {converted} celda(s) con texto convertidas a número, "
+        f"{blank} sin dígitos tratadas como vacías"
+    )
+    
+    return numbers
+
+
+def format_text_column(series):
+    """Convierte una columna de texto en literales SQL, escapando comillas simples."""
+    
+    is_null = series.isna() | (series == "")
+    quoted = "'" + series.astype(str).str.replace("'", "''", regex=False) + "'"
+    return quoted.where(~is_null, "NULL")
+
+
+def format_int_column(series):
+    """Convierte una columna numérica en literales SQL enteros."""
+    
+    numbers = pd.to_numeric(series).astype("float64")
+    is_valid = np.isfinite(numbers)
+    in_range = is_valid & (numbers.abs() < 2**63)
+    
+    out_of_range = is_valid & ~in_range
+    if out_of_range.any():
+        rows = ", ".join(str(index + 2) for index in series.index[out_of_range])
+        raise ValueError(f"Valor fuera del rango entero en la columna {series.name} (fila(s) {rows})")
+    
+    is_whole = in_range & (numbers % 1 == 0)
+    whole = numbers.where(is_whole, 0).astype("int64").astype(str)
+    # Los valores no enteros se escriben tal cual para que PostgreSQL los convierta
+    literals = whole.where(is_whole, numbers.astype(str))
+    return literals.where(is_valid, "NULL")
+
+
+def format_float_column(series):
+    """Convierte una columna numérica en literales SQL decimales."""
+    
+    numbers = pd.to_numeric(series).astype("float64")
+    is_valid = np.isfinite(numbers)
+    return numbers.astype(str).where(is_valid, "NULL")
+
+
+SQL_FORMATTERS = {
+    "text": format_text_column,
+    "int": format_int_column,
+    "float": format_float_column,
+}
+
+
+def quote_identifier(column):
+    """Entrecomilla identificadores camelCase para PostgreSQL."""
+    
+    return column if column.islower() else f'"{column}"'
+
+
+def generate_inserts(df, table, schema):
+    """Genera las sentencias INSERT de una tabla, formateando columna por columna."""
     
-    if isinstance(value, str):
-        # Escapar comillas simples
-        escaped = value.replace("'", "''")
-        return f"'{escaped}'"
+    column_list = ", ".join(quote_identifier(column) for column, _, _ in schema)
     
-    if isinstance(value, (int, float)):
-        return str(value)
+    values = None
+    for column, kind, _ in schema:
+        literals = SQL_FORMATTERS[kind](df[column])
+        values = literals if values is None else values + ", " + literals
     
-    return f"'{str(value)}'"
+    prefix = f"""INSERT INTO {table} ({column_list}, "createdAt", "updatedAt")\nVALUES ("""
+    return (prefix + values + ", NOW(), NOW());").tolist()
 
 
 def generate_products_sql(df):
@@ -32,22 +177,7 @@ def generate_products_sql(df):
     sql_statements.append("-- INSERCIÓN DE PRODUCTOS (products)")
     sql_statements.append("-- ============================================\n")
     
-    for _, row in df.iterrows():
-        codigo = escape_sql_string(row.get('codigo', ''))
-        nombre = escape_sql_string(row.get('nombre', ''))
-        costoUnitario = row.get('costoUnitario', 0)
-        ubicacion = escape_sql_string(row.get('ubicacion', 'ALMACEN PRINCIPAL'))
-        salidas = row.get('salidas', 0)
-        stockActual = row.get('stockActual', 0)
-        stockMinimo = row.get('stockMinimo', 0)
-        unidadMedida = escape_sql_string(row.get('unidadMedida', 'UND'))
-        providerId = row.get('providerId', 1)
-        costoTotal = row.get('costoTotal', 0)
-        
-        sql = f"""INSERT INTO products (codigo, nombre, "costoUnitario", ubicacion, salidas, "stockActual", "stockMinimo", "unidadMedida", "providerId", "costoTotal", "createdAt", "updatedAt")
-VALUES ({codigo}, {nombre}, {costoUnitario}, {ubicacion}, {salidas}, {stockActual}, {stockMinimo}, {unidadMedida}, {providerId}, {costoTotal}, NOW(), NOW());"""
-        
-        sql_statements.append(sql)
+    sql_statements.extend(generate_inserts(df, "products", PRODUCTS_SCHEMA))
     
     return "\n\n".join(sql_statements)
 
@@ -60,17 +190,7 @@ def generate_movement_entries_sql(df):
     sql_statements.append("-- INSERCIÓN DE ENTRADAS (movement_entries)")
     sql_statements.append("-- ============================================\n")
     
-    for _, row in df.iterrows():
-        fecha = escape_sql_string(row.get('fecha', ''))
-        codigoProducto = escape_sql_string(row.get('codigoProducto', ''))
-        descripcion = escape_sql_string(row.get('descripcion', ''))
-        precioUnitario = row.get('precioUnitario', 0)
-        cantidad = row.get('cantidad', 0)
-        
-        sql = f"""INSERT INTO movement_entries (fecha, "codigoProducto", descripcion, "precioUnitario", cantidad, "createdAt", "updatedAt")
-VALUES ({fecha}, {codigoProducto}, {descripcion}, {precioUnitario}, {cantidad}, NOW(), NOW());"""
-        
-        sql_statements.append(sql)
+    sql_statements.extend(generate_inserts(df, "movement_entries", MOVEMENT_ENTRIES_SCHEMA))
     
     return "\n\n".join(sql_statements)
 
@@ -83,21 +203,7 @@ def generate_movement_exits_sql(df):
     sql_statements.append("-- INSERCIÓN DE SALIDAS (movement_exits)")
     sql_statements.append("-- ============================================\n")
     
-    for _, row in df.iterrows():
-        fecha = escape_sql_string(row.get('fecha', ''))
-        codigoProducto = escape_sql_string(row.get('codigoProducto', ''))
-        descripcion = escape_sql_string(row.get('descripcion', ''))
-        precioUnitario = row.get('precioUnitario', 0)
-        cantidad = row.get('cantidad', 0)
-        responsable = escape_sql_string(row.get('responsable', ''))
-        area = escape_sql_string(row.get('area', ''))
-        proyecto = escape_sql_string(row.get('proyecto', ''))
-        
-        # Construir la sentencia SQL
-        sql = f"""INSERT INTO movement_exits (fecha, "codigoProducto", descripcion, "precioUnitario", cantidad, responsable, area, proyecto, "createdAt", "updatedAt")
-VALUES ({fecha}, {codigoProducto}, {descripcion}, {precioUnitario}, {cantidad}, {responsable}, {area}, {proyecto}, NOW(), NOW());"""
-        
-        sql_statements.append(sql)
+    sql_statements.extend(generate_inserts(df, "movement_exits", MOVEMENT_EXITS_SCHEMA))
     
     return "\n\n".join(sql_statements)
 
@@ -117,10 +223,11 @@ def main():
     
     print(f"Leyendo archivo: {excel_file.name}")
     
-    # Leer las hojas del Excel
-    df_stock = pd.read_excel(excel_file, sheet_name='Stock')
-    df_entradas = pd.read_excel(excel_file, sheet_name='Entradas')
-    df_salidas = pd.read_excel(excel_file, sheet_name='Salidas')
+    # Leer las hojas del Excel (solo las columnas que usa cada tabla)
+    workbook = pd.ExcelFile(excel_file)
+    df_stock = read_sheet(workbook, 'Stock', PRODUCTS_SCHEMA)
+    df_entradas = read_sheet(workbook, 'Entradas', MOVEMENT_ENTRIES_SCHEMA)
+    df_salidas = read_sheet(workbook, 'Salidas', MOVEMENT_EXITS_SCHEMA)
     
     print(f"\nDatos cargados:")
     print(f"  - Productos (Stock): {len(df_stock)} registros")